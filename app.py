@@ -1,22 +1,21 @@
 import streamlit as st
 import folium
 from streamlit_folium import st_folium
-import json
 import pandas as pd
 from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
 import openai
 from dotenv import load_dotenv
 import os
 import urllib.parse
 from typing import Dict, List, Tuple, Optional
+from venue_store import ShardedVenueStore, DEFAULT_SHARD_DIR
 
 # Load environment variables
 load_dotenv()
 
 # Configure page
 st.set_page_config(
-    page_title="Nature in NYC | Rooftop Bar Finder",
+    page_title="Rooftop Bar Finder",
     page_icon="🏙️",
     layout="wide",
     initial_sidebar_state="collapsed"
@@ -207,9 +206,17 @@ def get_openai_key():
             pass
     return api_key
 
+@st.cache_resource
+def get_venue_store() -> ShardedVenueStore:
+    """Shared venue store so loaded shards survive reruns and sessions"""
+    max_loaded = int(os.getenv("MAX_LOADED_VENUES", "5000"))
+    return ShardedVenueStore(DEFAULT_SHARD_DIR, max_loaded_venues=max_loaded)
+
+DEFAULT_CITY = "nyc"
+
 class RooftopBarFinder:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="elevate_nyc_finder")
+    def __init__(self, city: Optional[str] = None):
+        self.geolocator = Nominatim(user_agent="elevate_rooftop_finder")
         
         # Initialize OpenAI if key available
         openai_key = get_openai_key()
@@ -217,50 +224,48 @@ class RooftopBarFinder:
             openai.api_key = openai_key
         
         self.load_bars_data()
-        
-        self.nyc_neighborhoods = {
-            "Manhattan": [
-                "SoHo", "Greenwich Village", "East Village", "West Village", 
-                "Tribeca", "Financial District", "Lower East Side", "Nolita",
-                "Little Italy", "Chinatown", "Chelsea", "Meatpacking District",
-                "Flatiron", "Union Square", "Gramercy", "NoMad", "Murray Hill",
-                "Midtown East", "Midtown West", "Times Square", "Hell's Kitchen",
-                "Upper East Side", "Upper West Side", "Morningside Heights",
-                "Harlem", "East Harlem", "Washington Heights", "Inwood"
-            ],
-            "Brooklyn": [
-                "DUMBO", "Brooklyn Heights", "Cobble Hill", "Carroll Gardens",
-                "Williamsburg", "Greenpoint", "Bushwick", "Park Slope", 
-                "Prospect Heights", "Crown Heights", "Red Hook", "Sunset Park"
-            ],
-            "Queens": [
-                "Long Island City", "Astoria", "Sunnyside", "Jackson Heights",
-                "Elmhurst", "Flushing", "Forest Hills"
-            ],
-            "Bronx": [
-                "Mott Haven", "Port Morris", "Fordham", "Riverdale"
-            ],
-            "Staten Island": [
-                "St. George", "Stapleton", "Port Richmond"
-            ]
-        }
+        self.set_city(city)
     
     def load_bars_data(self):
-        """Load rooftop bars data"""
+        """Open the sharded venue store (shards themselves load on demand)"""
         try:
-            with open('data/rooftop_bars.json', 'r') as f:
-                self.bars_data = json.load(f)
+            self.store = get_venue_store()
         except FileNotFoundError:
-            st.error("🚨 Bars data file not found. Please check data/rooftop_bars.json")
-            self.bars_data = []
+            st.error(f"🚨 Venue manifest not found. Please check {DEFAULT_SHARD_DIR}/manifest.json")
+            self.store = None
+    
+    def default_city(self) -> Optional[str]:
+        """NYC when the manifest has it, otherwise the first city listed"""
+        cities = list(self.store.cities) if self.store else []
+        if DEFAULT_CITY in cities:
+            return DEFAULT_CITY
+        return cities[0] if cities else None
+    
+    def set_city(self, city: Optional[str]):
+        """Switch the active city, falling back to the default for unknown ids"""
+        cities = self.store.cities if self.store else {}
+        if city not in cities:
+            city = self.default_city()
+        self.city = city
+        self.city_info = cities.get(city, {})
+        self.city_name = self.city_info.get('short_name') or self.city_info.get('name') or "the City"
+        self.neighborhoods = self.city_info.get("neighborhoods", {})
+    
+    def get_bars_in_borough(self, borough: str) -> List[Dict]:
+        """All venues in one borough of the active city"""
+        # A missing borough must not fall through to loading the whole city
+        if not self.store or not borough:
+            return []
+        return list(self.store.iter_bars(self.city, borough))
     
     def generate_bar_links(self, bar: Dict) -> Dict:
         """Generate search links"""
-        name = urllib.parse.quote_plus(f"{bar.get('name', '')} NYC")
+        name = urllib.parse.quote_plus(f"{bar.get('name', '')} {self.city_info.get('short_name', '')}".strip())
         address = urllib.parse.quote_plus(bar.get('address', ''))
+        region = urllib.parse.quote_plus(self.city_info.get('region', ''))
         
         return {
-            'yelp': f"https://www.yelp.com/search?find_desc={name}&find_loc=New+York%2C+NY",
+            'yelp': f"https://www.yelp.com/search?find_desc={name}&find_loc={region}",
             'maps': f"https://www.google.com/maps/search/?api=1&query={address}",
             'opentable': f"https://www.opentable.com/s?query={name}"
         }
@@ -268,7 +273,8 @@ class RooftopBarFinder:
     def get_neighborhood_center(self, neighborhood: str, borough: str) -> Tuple[Optional[float], Optional[float]]:
         """Get coordinates for neighborhood"""
         try:
-            query = f"{neighborhood}, {borough}, New York, NY"
+            parts = [neighborhood, borough, self.city_info.get('region')]
+            query = ", ".join(part for part in parts if part)
             location = self.geolocator.geocode(query)
             if location:
                 return location.latitude, location.longitude
@@ -277,25 +283,11 @@ class RooftopBarFinder:
             st.error(f"Error finding location: {e}")
             return None, None
     
-    def calculate_distance(self, user_coords: Tuple[float, float], bar_coords: Tuple[float, float]) -> float:
-        """Calculate distance"""
-        return geodesic(user_coords, bar_coords).miles
-    
     def get_bars_nearby(self, user_lat: float, user_lng: float, max_distance: int = 5) -> List[Dict]:
-        """Get nearby bars"""
-        nearby_bars = []
-        user_coords = (user_lat, user_lng)
-        
-        for bar in self.bars_data:
-            bar_coords = (bar['lat'], bar['lng'])
-            distance = self.calculate_distance(user_coords, bar_coords)
-            
-            if distance <= max_distance:
-                bar_copy = bar.copy()
-                bar_copy['distance'] = distance
-                nearby_bars.append(bar_copy)
-        
-        return sorted(nearby_bars, key=lambda x: x['distance'])
+        """Get nearby bars from the shards overlapping the search radius"""
+        if not self.store:
+            return []
+        return self.store.get_bars_nearby(self.city, user_lat, user_lng, max_distance)
     
     def generate_ai_description(self, bar_name: str, vibe: str) -> str:
         """Generate AI description"""
@@ -369,7 +361,7 @@ def render_bar_card_native(bar: Dict, index: int):
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("📍 Location", bar.get('neighborhood', 'NYC'))
+            st.metric("📍 Location", bar.get('neighborhood') or finder.city_name)
         
         with col2:
             rating = bar.get('rating', 0)
@@ -399,12 +391,15 @@ def render_bar_card_native(bar: Dict, index: int):
 
 def main():
     global finder
-    finder = RooftopBarFinder()
+    finder = RooftopBarFinder(st.session_state.get('selected_city'))
+    # Keep the picker on a city the current manifest still has
+    st.session_state.selected_city = finder.city
+    st.set_page_config(page_title=f"Nature in {finder.city_name} | Rooftop Bar Finder")
     
     # Professional Header using native Streamlit
-    st.markdown("""
+    st.markdown(f"""
     <div class="custom-header">
-        <h1 class="main-title">Nature in NYC </h1>
+        <h1 class="main-title">Nature in {finder.city_name} </h1>
         <p class="subtitle">Discover the city's finest rooftop experiences</p>
         <p class="tagline">Curated • Premium • Elevated</p>
     </div>
@@ -414,20 +409,44 @@ def main():
     st.markdown('<div class="search-card">', unsafe_allow_html=True)
     st.subheader("🔍 Find Your Perfect Rooftop")
     
+    # City picker only appears once more than one city has been sharded
+    cities = finder.store.cities if finder.store else {}
+    if len(cities) > 1:
+        st.selectbox(
+            "City",
+            options=list(cities.keys()),
+            format_func=lambda c: cities[c].get('name', c),
+            key='selected_city'
+        )
+    finder.set_city(st.session_state.selected_city)
+    
+    # Results from another city's search don't apply here
+    if st.session_state.get('search_city', finder.city) != finder.city:
+        st.session_state.search_results = None
+        st.session_state.user_location = None
+        st.session_state.search_performed = False
+        st.session_state.pop('search_location', None)
+    st.session_state.search_city = finder.city
+    
+    if not finder.neighborhoods:
+        st.warning("🗺️ No boroughs are listed for this city yet. Rebuild its shards with venue_store.py.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    
     # Search controls
     col1, col2, col3 = st.columns([2, 2, 1])
     
     with col1:
         selected_borough = st.selectbox(
             "Borough",
-            options=list(finder.nyc_neighborhoods.keys()),
+            options=list(finder.neighborhoods.keys()),
             index=0
         )
     
     with col2:
         selected_neighborhood = st.selectbox(
             "Neighborhood",
-            options=finder.nyc_neighborhoods[selected_borough]
+            options=finder.neighborhoods.get(selected_borough, [])
         )
     
     with col3:
@@ -522,10 +541,12 @@ def main():
     # Featured Section
     elif not st.session_state.search_performed:
         st.subheader("🌟 Featured Rooftop Experiences")
-        st.write("*Discover NYC's most exceptional rooftop venues*")
+        st.write(f"*Discover {selected_borough}'s most exceptional rooftop venues*")
         
-        if finder.bars_data:
-            featured_bars = sorted(finder.bars_data, key=lambda x: x.get('rating', 0), reverse=True)[:6]
+        # Only the selected borough's shard is loaded for the featured list
+        borough_bars = finder.get_bars_in_borough(selected_borough)
+        if borough_bars:
+            featured_bars = sorted(borough_bars, key=lambda x: x.get('rating', 0), reverse=True)[:6]
             
             col1, col2 = st.columns(2)
             
@@ -535,6 +556,8 @@ def main():
                     bar_with_ai = bar.copy()
                     bar_with_ai['vibe'] = ai_description
                     render_bar_card_native(bar_with_ai, i)
+        else:
+            st.info(f"No featured venues in {selected_borough} yet. Try searching a nearby neighborhood.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,6 +8,7 @@ import json
 import os
 from typing import List, Dict
 import time
+from venue_store import ShardedVenueStore
 
 class VenueDataEnhancer:
     def __init__(self):
@@ -107,9 +108,9 @@ class VenueDataEnhancer:
 if __name__ == "__main__":
     enhancer = VenueDataEnhancer()
     
-    # Load existing data
-    with open('data/rooftop_bars.json', 'r') as f:
-        existing_data = json.load(f)
+    # Load existing NYC data from every borough shard
+    store = ShardedVenueStore()
+    existing_data = list(store.iter_bars("nyc"))
     
     # Enhance with additional sources
     enhanced_data = enhancer.enhance_venue_data(existing_data)
@@ -118,4 +119,5 @@ if __name__ == "__main__":
     with open('data/rooftop_bars_enhanced.json', 'w') as f:
         json.dump(enhanced_data, f, indent=2)
     
-    print(f"Enhanced dataset: {len(existing_data)} -> {len(enhanced_data)} venues")
\ No newline at end of file
+    print(f"Enhanced dataset: {len(existing_data)} -> {len(enhanced_data)} venues")
+    print("Re-shard with: python venue_store.py data/rooftop_bars_enhanced.json --city nyc")
\ No newline at end of file
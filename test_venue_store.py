@@ -0,0 +1,120 @@
+import os
+
+import pytest
+from geopy.distance import geodesic
+
+from venue_store import ShardedVenueStore, build_shards, radius_bounding_box
+
+
+def venue(name, lat, lng, borough, neighborhood=""):
+    return {"name": name, "lat": lat, "lng": lng, "borough": borough, "neighborhood": neighborhood}
+
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    """Two boroughs meeting around lng -73.97 plus one far away"""
+    venues = [
+        venue("West 1", 40.75, -73.99, "West", "Hudson"),
+        venue("West 2", 40.76, -73.98, "West", "Hudson"),
+        venue("East 1", 40.75, -73.96, "East", "Riverside"),
+        venue("East 2", 40.76, -73.95, "East", "Riverside"),
+        venue("Far 1", 40.55, -74.15, "Far", "Harbor"),
+        venue("Far 2", 40.56, -74.14, "Far", "Harbor"),
+    ]
+    build_shards(venues, "test", str(tmp_path), name="Test City", region="Test, TC")
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("lat", [0.0, 25.77, 40.71, 60.0])
+@pytest.mark.parametrize("radius", [0.5, 10.0])
+def test_radius_box_encloses_geodesic_circle(lat, radius):
+    box = radius_bounding_box(lat, 0.0, radius)
+    for bearing in range(0, 360, 15):
+        point = geodesic(miles=radius).destination((lat, 0.0), bearing)
+        assert box[0] <= point.latitude <= box[2]
+        assert box[1] <= point.longitude <= box[3]
+
+
+def test_search_near_boundary_loads_only_overlapping_shards(shard_dir):
+    store = ShardedVenueStore(shard_dir)
+    bars = store.get_bars_nearby("test", 40.755, -73.97, 2)
+
+    assert {bar["name"] for bar in bars} == {"West 1", "West 2", "East 1", "East 2"}
+    assert sorted(store.loaded_shards) == ["test/east", "test/west"]
+
+
+def test_search_inside_one_borough_loads_one_shard(shard_dir):
+    store = ShardedVenueStore(shard_dir)
+    bars = store.get_bars_nearby("test", 40.555, -74.145, 1)
+
+    assert {bar["name"] for bar in bars} == {"Far 1", "Far 2"}
+    assert store.loaded_shards == ["test/far"]
+
+
+def test_lru_eviction_under_venue_cap(shard_dir):
+    store = ShardedVenueStore(shard_dir, max_loaded_venues=4)
+    store.load_shard("test/west")
+    store.load_shard("test/east")
+    store.load_shard("test/west")  # now most recently used
+    store.load_shard("test/far")
+
+    assert store.loaded_shards == ["test/west", "test/far"]
+
+
+def test_build_shards_derives_neighborhoods(shard_dir):
+    store = ShardedVenueStore(shard_dir)
+    assert store.get_neighborhoods("test") == {
+        "East": ["Riverside"], "Far": ["Harbor"], "West": ["Hudson"]
+    }
+    assert store.cities["test"]["region"] == "Test, TC"
+
+
+def test_build_shards_requires_region_for_new_city(tmp_path):
+    with pytest.raises(ValueError):
+        build_shards([venue("A", 25.77, -80.19, "Downtown")], "miami", str(tmp_path))
+
+
+def test_build_shards_refuses_empty_source(shard_dir):
+    with pytest.raises(ValueError):
+        build_shards([{"name": "No coordinates"}], "test", shard_dir)
+
+    store = ShardedVenueStore(shard_dir)
+    assert len(store.shards_for_region("test")) == 3
+    assert sorted(os.listdir(os.path.join(shard_dir, "test"))) == ["east.json", "far.json", "west.json"]
+
+
+def test_build_shards_removes_stale_boroughs(shard_dir):
+    build_shards([venue("West 1", 40.75, -73.99, "West")], "test", shard_dir)
+
+    store = ShardedVenueStore(shard_dir)
+    assert list(store.shards) == ["test/west"]
+    assert os.listdir(os.path.join(shard_dir, "test")) == ["west.json"]
+
+
+def test_open_store_follows_rebuild(shard_dir):
+    store = ShardedVenueStore(shard_dir)
+    store.get_bars_nearby("test", 40.555, -74.145, 1)
+    store.get_bars_nearby("test", 40.755, -73.97, 2)
+    assert sorted(store.loaded_shards) == ["test/east", "test/far", "test/west"]
+
+    # Drop "Far", move "East" and add a new borough while the store is open
+    build_shards([
+        venue("West 1", 40.75, -73.99, "West", "Hudson"),
+        venue("West 2", 40.76, -73.98, "West", "Hudson"),
+        venue("East 3", 40.80, -73.93, "East", "Riverside"),
+        venue("North 1", 40.90, -73.90, "North", "Hills"),
+    ], "test", shard_dir)
+
+    assert store.get_bars_nearby("test", 40.555, -74.145, 1) == []
+    assert [bar["name"] for bar in store.get_bars_nearby("test", 40.80, -73.93, 0.5)] == ["East 3"]
+    assert [bar["name"] for bar in store.get_bars_nearby("test", 40.90, -73.90, 0.5)] == ["North 1"]
+    assert "North" in store.get_neighborhoods("test")
+    assert "test/far" not in store.loaded_shards
+
+
+def test_missing_shard_file_loads_as_empty(shard_dir):
+    store = ShardedVenueStore(shard_dir)
+    os.remove(os.path.join(shard_dir, "test", "far.json"))
+
+    assert store.load_shard("test/far") == []
+    assert store.get_bars_nearby("test", 40.555, -74.145, 1) == []
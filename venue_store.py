@@ -0,0 +1,317 @@
+"""
+Sharded venue storage for multi-city rooftop bar data
+
+Venues live in per-city, per-borough JSON shards under data/shards/, described
+by a manifest that records each shard's bounding box. Shards are only read
+from disk when a query touches their region and are evicted least-recently-used
+once the number of loaded venues exceeds a cap, so memory scales with the
+regions being searched rather than the total dataset.
+
+Rebuild the shards for a city from a flat venue list with:
+
+    python venue_store.py data/rooftop_bars_enhanced.json --city nyc
+
+A new city also needs a geocoding region:
+
+    python venue_store.py miami.json --city miami --name Miami --region "Miami, FL"
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from geopy.distance import geodesic
+
+DEFAULT_SHARD_DIR = os.path.join("data", "shards")
+MANIFEST_FILE = "manifest.json"
+
+# Shortest a degree of latitude gets (at the equator); longitude degrees shrink
+# with cos(latitude). Underestimating keeps the box around the geodesic circle.
+MILES_PER_DEGREE = 68.7
+# Extra margin for the circle's longitude reach away from its centre latitude
+BOX_PADDING = 1.01
+
+BoundingBox = Tuple[float, float, float, float]  # (min_lat, min_lng, max_lat, max_lng)
+
+
+def radius_bounding_box(lat: float, lng: float, radius_miles: float) -> BoundingBox:
+    """Bounding box enclosing a circle of radius_miles around a point"""
+    radius_miles *= BOX_PADDING
+    lat_delta = radius_miles / MILES_PER_DEGREE
+    # Clamp so the box stays finite near the poles
+    lng_scale = max(math.cos(math.radians(lat)), 0.01)
+    lng_delta = radius_miles / (MILES_PER_DEGREE * lng_scale)
+    return (lat - lat_delta, lng - lng_delta, lat + lat_delta, lng + lng_delta)
+
+
+def boxes_overlap(a: BoundingBox, b: BoundingBox) -> bool:
+    """Check whether two bounding boxes intersect"""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def slugify(value: str) -> str:
+    """Turn a borough or city name into a file-safe shard name"""
+    return "_".join(value.lower().replace("'", "").replace(".", "").split())
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    """Modification time and inode; os.replace always yields a new inode"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_ino)
+
+
+class ShardedVenueStore:
+    def __init__(self, shard_dir: str = DEFAULT_SHARD_DIR, max_loaded_venues: int = 5000):
+        self.shard_dir = shard_dir
+        self.max_loaded_venues = max_loaded_venues
+        self._manifest_path = os.path.join(shard_dir, MANIFEST_FILE)
+
+        self._cities: Dict[str, Dict] = {}
+        self._shards: Dict[str, Dict] = {}
+        self._manifest_mtime: Optional[Tuple[int, int]] = None
+
+        # shard id -> venues, ordered from least to most recently used
+        self._loaded: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        # shard id -> file version when it was read, to spot rewritten shards
+        self._loaded_mtimes: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._loaded_count = 0
+        # Streamlit shares one store across sessions, so guard the cache
+        self._lock = threading.Lock()
+
+        self._refresh_manifest()
+
+    def _refresh_manifest(self):
+        """Re-read the manifest if build_shards has replaced it since the last read"""
+        mtime = _file_version(self._manifest_path)
+        if mtime == self._manifest_mtime:
+            return
+
+        with open(self._manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        with self._lock:
+            self._cities = manifest.get("cities", {})
+            old_shards = self._shards
+            self._shards = {shard["id"]: shard for shard in manifest.get("shards", [])}
+            self._manifest_mtime = mtime
+
+            # Drop cached shards that were removed, moved, re-bounded or rewritten
+            for shard_id in list(self._loaded):
+                shard = self._shards.get(shard_id)
+                if shard is None or shard != old_shards.get(shard_id) or \
+                        self._shard_mtime(shard) != self._loaded_mtimes.get(shard_id):
+                    self._loaded_count -= len(self._loaded.pop(shard_id))
+                    self._loaded_mtimes.pop(shard_id, None)
+
+    def _shard_mtime(self, shard: Dict) -> Optional[Tuple[int, int]]:
+        """Version of a shard file, or None if it is missing"""
+        try:
+            return _file_version(os.path.join(self.shard_dir, shard["path"]))
+        except FileNotFoundError:
+            return None
+
+    @property
+    def cities(self) -> Dict[str, Dict]:
+        """City id -> name, region and neighborhoods from the current manifest"""
+        self._refresh_manifest()
+        return self._cities
+
+    @property
+    def shards(self) -> Dict[str, Dict]:
+        """Shard id -> manifest entry from the current manifest"""
+        self._refresh_manifest()
+        return self._shards
+
+    @property
+    def loaded_shards(self) -> List[str]:
+        """Ids of the shards currently held in memory"""
+        with self._lock:
+            return list(self._loaded.keys())
+
+    def get_neighborhoods(self, city: str) -> Dict[str, List[str]]:
+        """Borough -> neighborhood names for a city"""
+        return self.cities.get(city, {}).get("neighborhoods", {})
+
+    def shards_for_region(self, city: str, borough: Optional[str] = None) -> List[Dict]:
+        """Manifest entries for a city, optionally limited to one borough"""
+        return [
+            shard for shard in self.shards.values()
+            if shard["city"] == city and (borough is None or shard["borough"] == borough)
+        ]
+
+    def shards_for_box(self, city: str, box: BoundingBox) -> List[Dict]:
+        """Manifest entries for a city whose bounding box overlaps box"""
+        return [
+            shard for shard in self.shards_for_region(city)
+            if boxes_overlap(tuple(shard["bbox"]), box)
+        ]
+
+    def load_shard(self, shard_id: str) -> List[Dict]:
+        """Return a shard's venues, reading it from disk if not cached"""
+        with self._lock:
+            if shard_id in self._loaded:
+                self._loaded.move_to_end(shard_id)
+                return self._loaded[shard_id]
+            shard = self._shards.get(shard_id)
+
+        # A rebuild may have removed the shard since the caller looked it up
+        if shard is None:
+            return []
+        mtime = self._shard_mtime(shard)
+        try:
+            with open(os.path.join(self.shard_dir, shard["path"]), 'r') as f:
+                venues = json.load(f)
+        except FileNotFoundError:
+            return []
+
+        with self._lock:
+            if shard_id not in self._loaded and self._shards.get(shard_id) == shard:
+                self._loaded[shard_id] = venues
+                self._loaded_mtimes[shard_id] = mtime
+                self._loaded_count += len(venues)
+                self._evict()
+            return venues
+
+    def _evict(self):
+        """Drop least recently used shards until under the venue cap"""
+        # Always keep the most recently loaded shard, even if it alone exceeds the cap
+        while self._loaded_count > self.max_loaded_venues and len(self._loaded) > 1:
+            shard_id, venues = self._loaded.popitem(last=False)
+            self._loaded_mtimes.pop(shard_id, None)
+            self._loaded_count -= len(venues)
+
+    def iter_bars(self, city: str, borough: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over every venue in a city or borough"""
+        for shard in self.shards_for_region(city, borough):
+            yield from self.load_shard(shard["id"])
+
+    def get_bars_nearby(self, city: str, lat: float, lng: float, max_distance: float) -> List[Dict]:
+        """Venues within max_distance miles, loading only overlapping shards"""
+        box = radius_bounding_box(lat, lng, max_distance)
+        user_coords = (lat, lng)
+        nearby_bars = []
+
+        for shard in self.shards_for_box(city, box):
+            for bar in self.load_shard(shard["id"]):
+                if not (box[0] <= bar['lat'] <= box[2] and box[1] <= bar['lng'] <= box[3]):
+                    continue
+
+                distance = geodesic(user_coords, (bar['lat'], bar['lng'])).miles
+                if distance <= max_distance:
+                    bar_copy = bar.copy()
+                    bar_copy['distance'] = distance
+                    nearby_bars.append(bar_copy)
+
+        return sorted(nearby_bars, key=lambda x: x['distance'])
+
+
+def _write_json_atomic(path: str, data) -> None:
+    """Write JSON next to path and swap it in so readers never see a partial file"""
+    # A unique temp file per write, so concurrent rebuilds never share one
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), suffix=".tmp",
+                                     delete=False, encoding='utf-8') as f:
+        tmp_path = f.name
+        try:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    # NamedTemporaryFile is owner-only; shards must stay readable by the app
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def build_shards(venues: List[Dict], city: str, shard_dir: str = DEFAULT_SHARD_DIR,
+                 name: Optional[str] = None, region: Optional[str] = None) -> List[Dict]:
+    """Write one shard per borough for a city and update the manifest"""
+    manifest_path = os.path.join(shard_dir, MANIFEST_FILE)
+    manifest = {"cities": {}, "shards": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    by_borough: Dict[str, List[Dict]] = {}
+    for venue in venues:
+        if venue.get('lat') is None or venue.get('lng') is None:
+            continue
+        by_borough.setdefault(venue.get('borough') or "Other", []).append(venue)
+
+    # Refuse to replace a city with nothing, e.g. a source file without coordinates
+    if not by_borough:
+        raise ValueError(f"No venues with coordinates to shard for '{city}'")
+
+    city_info = manifest["cities"].get(city)
+    if city_info is None:
+        if not region:
+            raise ValueError(f"New city '{city}' needs a region for geocoding, e.g. 'Miami, FL'")
+        city_info = {"name": name or city, "short_name": name or city, "region": region, "neighborhoods": {}}
+    if name:
+        city_info["name"] = name
+    if region:
+        city_info["region"] = region
+
+    # Keep curated neighborhoods and add any borough or neighborhood the venues mention
+    neighborhoods = city_info.setdefault("neighborhoods", {})
+    for borough, borough_venues in sorted(by_borough.items()):
+        known = neighborhoods.setdefault(borough, [])
+        for venue in borough_venues:
+            if venue.get('neighborhood') and venue['neighborhood'] not in known:
+                known.append(venue['neighborhood'])
+
+    city_dir = os.path.join(shard_dir, city)
+    os.makedirs(city_dir, exist_ok=True)
+
+    city_shards = []
+    for borough, borough_venues in sorted(by_borough.items()):
+        path = f"{city}/{slugify(borough)}.json"
+        _write_json_atomic(os.path.join(shard_dir, path), borough_venues)
+
+        city_shards.append({
+            "id": f"{city}/{slugify(borough)}",
+            "city": city,
+            "borough": borough,
+            "path": path,
+            "count": len(borough_venues),
+            "bbox": [
+                min(v['lat'] for v in borough_venues),
+                min(v['lng'] for v in borough_venues),
+                max(v['lat'] for v in borough_venues),
+                max(v['lng'] for v in borough_venues)
+            ]
+        })
+
+    old_paths = {s["path"] for s in manifest["shards"] if s["city"] == city}
+    manifest["cities"][city] = city_info
+    manifest["shards"] = [s for s in manifest["shards"] if s["city"] != city] + city_shards
+    _write_json_atomic(manifest_path, manifest)
+
+    # Only once the new manifest is live, remove shards of boroughs that no longer exist
+    for stale_path in old_paths - {s["path"] for s in city_shards}:
+        full_path = os.path.join(shard_dir, stale_path)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+
+    return city_shards
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split a flat venue JSON file into borough shards")
+    parser.add_argument("source", help="JSON file containing a list of venues")
+    parser.add_argument("--city", required=True, help="City id to store the shards under, e.g. nyc")
+    parser.add_argument("--name", help="Display name, e.g. 'Miami'")
+    parser.add_argument("--region", help="Geocoding suffix, e.g. 'Miami, FL' (required for a new city)")
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR)
+    args = parser.parse_args()
+
+    with open(args.source, 'r') as f:
+        source_venues = json.load(f)
+
+    written = build_shards(source_venues, args.city, args.shard_dir, name=args.name, region=args.region)
+    for shard in written:
+        print(f"{shard['id']}: {shard['count']} venues")